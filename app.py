@@ -1,10 +1,45 @@
-import validators, streamlit as st
-from langchain.prompts import PromptTemplate
-from langchain_groq import ChatGroq
-from langchain.chains.summarize import load_summarize_chain
-from langchain_community.document_loaders import YoutubeLoader, UnstructuredURLLoader
+import streamlit as st
+from url_utils import extract_video_id, is_url
+from selectolax.parser import HTMLParser
+import diskcache
+import groq
+import tiktoken
+import httpx
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+import numpy as np
+import orjson
+import hashlib
 import os
-import re
+
+try:
+    from youtube_transcript_api import YouTubeTranscriptApi
+except ImportError:
+    YouTubeTranscriptApi = None
+
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+SUMMARY_CACHE_DIR = "./.summary_cache"
+SUMMARY_CACHE_TTL = 86400 * 7  # one week
+SEMANTIC_CACHE_THRESHOLD = 0.95
+SEMANTIC_CHUNK_WORDS = 150  # stays under the embedding model's 256 word-piece window
+
+# Token budget for a single prompt; longer content is map-reduced. gemma2-9b-it
+# has an 8192-token context, which must also fit the template and the answer
+MAX_PROMPT_TOKENS = 6000
+MAP_CHUNK_TOKENS = 4000
+MAX_MAP_CHUNKS = 8
+MAX_MAP_CONCURRENCY = 2  # keeps free-tier keys under Groq's tokens-per-minute limit
+
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
 
 ## Streamlit APP
 st.set_page_config(page_title="LangChain: Summarize Text From YT or Website", page_icon="🦜")
@@ -13,118 +48,326 @@ st.subheader('Summarize URL')
 
 ## Get API Keys
 with st.sidebar:
-    groq_api_key = st.text_input("Groq API Key", value="", type="password")
-
-generic_url = st.text_input("URL", label_visibility="collapsed")
+    groq_api_key = st.text_input("Groq API Key", value="", type="password", key="groq_api_key")
 
 prompt_template = """
 Provide a summary of the following content in 300 words:
 Content:{text}
 
 """
-prompt = PromptTemplate(template=prompt_template, input_variables=["text"])
+# LangChain imports are deferred into the functions that need them;
+# they dominate cold start and most reruns never touch them
 
-def extract_video_id(url):
-    """Extract YouTube video ID from URL"""
-    if "youtube.com/watch?v=" in url:
-        return url.split("watch?v=")[1].split("&")[0]
-    elif "youtu.be/" in url:
-        return url.split("youtu.be/")[1].split("?")[0]
-    return None
+@st.cache_resource
+def get_prompt():
+    """Build the summary PromptTemplate once per process"""
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(template=prompt_template, input_variables=["text"])
 
-def get_youtube_transcript(video_id):
-    """Get YouTube transcript using multiple methods"""
+@st.cache_resource
+def get_http_client():
+    """Shared keep-alive HTTP client for Groq API calls"""
+    return httpx.Client(
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=10),
+    )
+
+@st.cache_resource
+def get_web_client():
+    """Shared keep-alive HTTP client for website fetches
+
+    It is shared by every session, so its cookie jar refuses all cookies;
+    otherwise one user's session cookies for a site would be sent on another
+    user's fetch of that site.
+    """
+    return httpx.Client(
+        http2=True,
+        timeout=10,
+        follow_redirects=True,
+        headers=BROWSER_HEADERS,
+        cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        limits=httpx.Limits(max_keepalive_connections=10),
+    )
+
+@st.cache_resource
+def get_llm(groq_api_key):
+    """Build the ChatGroq client once per API key"""
+    from langchain_groq import ChatGroq
+    return ChatGroq(model="gemma2-9b-it", groq_api_key=groq_api_key, http_client=get_http_client())
+
+@st.cache_resource
+def get_chain(groq_api_key):
+    """Build the prompt | llm | parser summary chain once per API key"""
+    from langchain_core.output_parsers import StrOutputParser
+    return get_prompt() | get_llm(groq_api_key) | StrOutputParser()
+
+class SimpleDoc:
+    def __init__(self, content, metadata=None):
+        self.page_content = content
+        self.metadata = metadata or {}
+
+@st.cache_resource
+def get_summary_cache():
+    """Open the on-disk summary cache once per process"""
+    return diskcache.Cache(SUMMARY_CACHE_DIR)
+
+@st.cache_resource
+def get_embedder():
+    """Load the embedding model for the semantic cache tier (None if not installed)"""
     try:
-        # Method 1: Try youtube-transcript-api
-        try:
-            from youtube_transcript_api import YouTubeTranscriptApi
-            transcript_list = YouTubeTranscriptApi.get_transcript(video_id, languages=['en', 'en-US', 'en-GB'])
-            text = " ".join([item['text'] for item in transcript_list])
-            return text, "transcript-api"
-        except ImportError:
-            st.warning("youtube-transcript-api not installed. Install with: pip install youtube-transcript-api")
-        except Exception as e:
-            st.warning(f"Transcript API failed: {str(e)}")
-    
-        # Method 2: Try yt-dlp
-        try:
-            import yt_dlp
-            ydl_opts = {
-                'writesubtitles': True,
-                'writeautomaticsub': True,
-                'subtitleslangs': ['en'],
-                'skip_download': True,
-                'quiet': True,
-                'no_warnings': True
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(f"https://youtube.com/watch?v={video_id}", download=False)
-                
-                # Get description as fallback
-                description = info.get('description', '')
-                if description and len(description) > 100:
-                    return description[:2000], "description"  # Limit length
-                    
-        except ImportError:
-            st.warning("yt-dlp not installed. Install with: pip install yt-dlp")
-        except Exception as e:
-            st.warning(f"yt-dlp failed: {str(e)}")
-    
-        return None, None
-        
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+
+@st.cache_resource
+def get_encoding():
+    """Load the tokenizer used for prompt budgeting"""
+    return tiktoken.get_encoding("cl100k_base")
+
+def _stream_summary(chain, content, placeholder):
+    """Stream summary tokens into placeholder as they arrive
+
+    Content over MAX_PROMPT_TOKENS is split into chunks that are summarized
+    in parallel first; the partial summaries are then summarized together.
+    """
+    enc = get_encoding()
+    tokens = enc.encode(content)
+    if len(tokens) > MAX_PROMPT_TOKENS:
+        notice = "Content is long"
+        max_tokens = MAP_CHUNK_TOKENS * MAX_MAP_CHUNKS
+        if len(tokens) > max_tokens:
+            notice += f" - only the first {max_tokens:,} of {len(tokens):,} tokens are summarized"
+            tokens = tokens[:max_tokens]
+        chunks = [enc.decode(tokens[i:i + MAP_CHUNK_TOKENS]) for i in range(0, len(tokens), MAP_CHUNK_TOKENS)]
+        placeholder.info(f"{notice} - summarizing {len(chunks)} parts first...")
+        partials = chain.batch(
+            [{"text": chunk} for chunk in chunks],
+            config={"max_concurrency": MAX_MAP_CONCURRENCY},
+        )
+        content = "\n\n".join(partials)
+        tokens = enc.encode(content)
+        if len(tokens) > MAX_PROMPT_TOKENS:
+            content = enc.decode(tokens[:MAX_PROMPT_TOKENS])
+
+    buf = []
+    for chunk in chain.stream({"text": content}):
+        buf.append(chunk)
+        placeholder.markdown("".join(buf))
+    return "".join(buf)
+
+def _embed_document(embedder, content):
+    """Mean-pool chunk embeddings so the whole document counts, not just its first 256 word-pieces"""
+    words = content.split()
+    chunks = [" ".join(words[i:i + SEMANTIC_CHUNK_WORDS]) for i in range(0, len(words), SEMANTIC_CHUNK_WORDS)]
+    embedding = embedder.encode(chunks or [""], normalize_embeddings=True).mean(axis=0)
+    return embedding / np.linalg.norm(embedding)
+
+def get_or_compute_summary(content, source, groq_api_key, placeholder):
+    """Return (summary, cache_hit) - reuse a cached summary or stream a new one and store it
+
+    source (URL or video id) scopes the semantic tier: only an earlier
+    version of the same page or video can be reused, never a different page
+    that merely shares boilerplate such as a site's navigation menu.
+    """
+    cache = get_summary_cache()
+    scope = get_llm(groq_api_key).model_name + get_prompt().template
+    key = hashlib.sha256((scope + content).encode()).hexdigest()
+
+    # Tier 1: exact content match
+    summary = cache.get(key)
+    if summary is not None:
+        return summary, "exact"
+
+    # Tier 2: near-duplicate content from the same source (only when sentence-transformers is installed).
+    # Embedding is slow on CPU, so only do it up front when there is an entry to compare against
+    semantic_key = "semantic:" + hashlib.sha256((scope + "\0" + source).encode()).hexdigest()
+    entry = cache.get(semantic_key)
+    embedding = None
+    if entry is not None:
+        embedder = get_embedder()
+        if embedder is not None:
+            embedding = _embed_document(embedder, content)
+            cached_embedding, cached_summary = entry
+            if float(cached_embedding @ embedding) > SEMANTIC_CACHE_THRESHOLD:
+                return cached_summary, "semantic"
+
+    summary = _stream_summary(get_chain(groq_api_key), content, placeholder)
+
+    cache.set(key, summary, expire=SUMMARY_CACHE_TTL)
+    # Embed after streaming so it never delays the first token
+    if embedding is None:
+        embedder = get_embedder()
+        if embedder is not None:
+            embedding = _embed_document(embedder, content)
+    if embedding is not None:
+        # One entry per source under its own key, so writes never clobber other sources
+        cache.set(semantic_key, (embedding, summary), expire=SUMMARY_CACHE_TTL)
+    return summary, None
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_website_text(url):
+    """Fetch a web page and return its visible text, cached per URL
+
+    Raises when the page has no text (e.g. it is rendered by JavaScript), so
+    the empty result is not cached.
+    """
+    response = get_web_client().get(url)
+    response.raise_for_status()
+
+    tree = HTMLParser(response.text)
+    tree.strip_tags(["script", "style", "noscript"])
+    node = tree.body or tree.root
+    text = node.text(separator=" ", strip=True) if node else ""
+    if not text:
+        raise RuntimeError("No readable text found on the page")
+    return text
+
+def _fetch_via_transcript_api(video_id):
+    """Method 1: youtube-transcript-api"""
+    if YouTubeTranscriptApi is None:
+        raise RuntimeError("youtube-transcript-api not installed. Install with: pip install youtube-transcript-api")
+    transcript_list = YouTubeTranscriptApi.get_transcript(video_id, languages=['en', 'en-US', 'en-GB'])
+    text = " ".join(map(itemgetter('text'), transcript_list))
+    return text, {}
+
+def _fetch_via_ytdlp(video_id):
+    """Method 2: yt-dlp video description"""
+    if yt_dlp is None:
+        raise RuntimeError("yt-dlp not installed. Install with: pip install yt-dlp")
+    ydl_opts = {
+        'writesubtitles': True,
+        'writeautomaticsub': True,
+        'subtitleslangs': ['en'],
+        'skip_download': True,
+        'quiet': True,
+        'no_warnings': True
+    }
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(f"https://youtube.com/watch?v={video_id}", download=False)
+
+    # Get description as fallback
+    description = info.get('description', '')
+    if description and len(description) > 100:
+        return description[:2000], {}  # Limit length
+    return None, {}
+
+# YouTube loading methods, tried stage by stage in cost order; methods within
+# a stage run concurrently in priority order. Each takes a video id and
+# returns (text, metadata), with text None when it has nothing usable.
+# youtube-transcript-api is fast and usually works, so the slow yt-dlp
+# lookup only starts when it fails.
+PROVIDER_STAGES = [
+    [("transcript-api", _fetch_via_transcript_api)],
+    [("description", _fetch_via_ytdlp)],
+]
+
+def _run_method(fn, video_id):
+    """Call a loading method in a worker thread, returning errors instead of raising"""
+    try:
+        return fn(video_id), None
     except Exception as e:
-        return None, str(e)
-
-if st.button("Summarize the Content from YT or Website"):
-    ## Validate all the inputs
-    if not groq_api_key.strip() or not generic_url.strip():
-        st.error("Please provide the information to get started")
-    elif not validators.url(generic_url):
-        st.error("Please enter a valid URL. It can be a YouTube video URL or website URL")
-    else:
-        try:
-            with st.spinner("Loading content..."):
-                # Initialize ChatGroq
-                llm = ChatGroq(model="gemma2-9b-it", groq_api_key=groq_api_key)
-                
-                docs = None
+        return (None, {}), e
+
+async def _race_youtube_methods(video_id, providers):
+    """Run every method concurrently and return the highest-priority success"""
+    warnings = []
+    loop = asyncio.get_running_loop()
+    # Private executor so a hung loser thread doesn't block asyncio.run() on shutdown
+    executor = ThreadPoolExecutor(max_workers=len(providers))
+    try:
+        tasks = [loop.run_in_executor(executor, _run_method, fn, video_id) for _, fn in providers]
+        pending = set(tasks)
+        for (method, _), task in zip(providers, tasks):
+            # Methods are checked in priority order; a lower-priority result
+            # is only used once everything ahead of it has failed
+            while not task.done():
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            (text, metadata), error = task.result()
+            if error:
+                warnings.append(f"{method} failed: {str(error)}")
+                continue
+            if text:
+                for other in pending:
+                    other.cancel()
+                return text, method, metadata, warnings
+        return None, None, {}, warnings
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+class TranscriptUnavailable(Exception):
+    """Every YouTube loading method failed; carries the per-method warnings"""
+    def __init__(self, warnings):
+        super().__init__("All YouTube loading methods failed")
+        self.warnings = warnings
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_youtube_transcript(video_id):
+    """Get YouTube transcript using multiple methods
+
+    Returns (text, method, metadata, warnings); warnings are returned rather
+    than shown because the methods run in worker threads. Raises
+    TranscriptUnavailable when nothing works, so failures are not cached.
+    """
+    warnings = []
+    for providers in PROVIDER_STAGES:
+        text, method, metadata, stage_warnings = asyncio.run(_race_youtube_methods(video_id, providers))
+        warnings.extend(stage_warnings)
+        if text:
+            return text, method, metadata, warnings
+    raise TranscriptUnavailable(warnings)
+
+def _warm_up_llm(llm):
+    """Send a one-token request so the connection and model are warm before the first summary"""
+    try:
+        llm.bind(max_tokens=1).invoke("hi")
+    except Exception:
+        pass  # Real errors (bad key, quota) are reported when Summarize is clicked
+
+# Warm up in the background while the user is still entering the URL
+if groq_api_key.strip() and st.session_state.get("warmed_key") != groq_api_key:
+    st.session_state["warmed_key"] = groq_api_key
+    threading.Thread(target=_warm_up_llm, args=(get_llm(groq_api_key),), daemon=True).start()
+
+@st.fragment
+def summarize_ui():
+    """URL input, Summarize button and results, rerun on their own as a fragment"""
+    generic_url = st.text_input("URL", label_visibility="collapsed")
+    groq_api_key = st.session_state.get("groq_api_key", "")
+
+    if st.button("Summarize the Content from YT or Website"):
+        ## Validate all the inputs
+        if not groq_api_key.strip() or not generic_url.strip():
+            st.error("Please provide the information to get started")
+        elif not is_url(generic_url):
+            st.error("Please enter a valid URL. It can be a YouTube video URL or website URL")
+        else:
+            try:
+                with st.spinner("Loading content..."):
+                    docs = None
                 
-                ## Loading YouTube or website data
-                if "youtube.com" in generic_url or "youtu.be" in generic_url:
-                    st.info("🔄 Loading YouTube video...")
+                    ## Loading YouTube or website data
+                    if "youtube.com" in generic_url or "youtu.be" in generic_url:
+                        st.info("🔄 Loading YouTube video...")
                     
-                    # Extract video ID
-                    video_id = extract_video_id(generic_url)
-                    if not video_id:
-                        st.error("❌ Could not extract video ID from URL")
-                    else:
-                        # Method 1: Try original YoutubeLoader (most reliable when it works)
-                        try:
-                            loader = YoutubeLoader.from_youtube_url(
-                                generic_url,
-                                add_video_info=True,
-                                language=['en', 'en-US']
-                            )
-                            docs = loader.load()
-                            st.success("✅ Loaded using YoutubeLoader")
-                            
-                        except Exception as e:
-                            st.warning(f"YoutubeLoader failed: {str(e)}")
-                            
-                            # Method 2: Try transcript extraction
-                            transcript_text, method = get_youtube_transcript(video_id)
-                            
+                        # Extract video ID
+                        video_id = extract_video_id(generic_url)
+                        if not video_id:
+                            st.error("❌ Could not extract video ID from URL")
+                        else:
+                            try:
+                                transcript_text, method, metadata, load_warnings = get_youtube_transcript(video_id)
+                            except TranscriptUnavailable as e:
+                                transcript_text, load_warnings = None, e.warnings
+                            for warning in load_warnings:
+                                st.warning(warning)
+
                             if transcript_text:
-                                # Create document manually
-                                class SimpleDoc:
-                                    def __init__(self, content, metadata=None):
-                                        self.page_content = content
-                                        self.metadata = metadata or {}
-                                
                                 docs = [SimpleDoc(
                                     transcript_text,
-                                    {"source": generic_url, "method": method}
+                                    {**metadata, "source": generic_url, "method": method}
                                 )]
                                 st.success(f"✅ Loaded using {method}")
                             else:
@@ -139,48 +382,48 @@ if st.button("Summarize the Content from YT or Website"):
                                 4. Try a different YouTube URL
                                 """)
                 
-                else:
-                    # Website loading
-                    st.info("🔄 Loading website...")
-                    try:
-                        loader = UnstructuredURLLoader(
-                            urls=[generic_url],
-                            ssl_verify=False,
-                            headers={
-                                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                            }
-                        )
-                        docs = loader.load()
-                        st.success("✅ Website loaded successfully")
-                    except Exception as e:
-                        st.error(f"❌ Failed to load website: {str(e)}")
-
-                # Generate summary if content was loaded
-                if docs and len(docs) > 0:
-                    with st.spinner("🤖 Generating summary..."):
-                        chain = load_summarize_chain(llm, chain_type="stuff", prompt=prompt)
-                        output_summary = chain.run(docs)
-                        
-                        st.subheader("📋 Summary")
-                        st.success(output_summary)
+                    else:
+                        # Website loading
+                        st.info("🔄 Loading website...")
+                        try:
+                            page_text = get_website_text(generic_url)
+                            docs = [SimpleDoc(page_text, {"source": generic_url})]
+                            st.success("✅ Website loaded successfully")
+                        except Exception as e:
+                            st.error(f"❌ Failed to load website: {str(e)}")
+
+                    # Generate summary if content was loaded
+                    if docs and len(docs) > 0:
+                        with st.spinner("🤖 Generating summary..."):
+                            st.subheader("📋 Summary")
+                            summary_placeholder = st.empty()
+                            output_summary, cache_hit = get_or_compute_summary(
+                                docs[0].page_content,
+                                extract_video_id(generic_url) or generic_url,
+                                groq_api_key,
+                                summary_placeholder,
+                            )
+                            summary_placeholder.success(output_summary)
+                            if cache_hit:
+                                st.caption(f"⚡ Served from cache ({cache_hit} match)")
                         
-                        # Show content details
-                        with st.expander("📊 Content Details"):
-                            st.write(f"**Content length:** {len(docs[0].page_content)} characters")
-                            if hasattr(docs[0], 'metadata') and docs[0].metadata:
-                                st.json(docs[0].metadata)
-                else:
-                    st.error("❌ Could not load any content from the URL")
+                            # Show content details
+                            with st.expander("📊 Content Details"):
+                                st.write(f"**Content length:** {len(docs[0].page_content)} characters")
+                                if hasattr(docs[0], 'metadata') and docs[0].metadata:
+                                    st.code(orjson.dumps(docs[0].metadata, option=orjson.OPT_INDENT_2).decode(), language="json")
+                    else:
+                        st.error("❌ Could not load any content from the URL")
                     
-        except Exception as e:
-            error_msg = str(e).lower()
-            if "groq_api_key" in error_msg or "api key" in error_msg:
+            except groq.AuthenticationError:
                 st.error("❌ Invalid Groq API key. Please check your key and try again.")
-            elif "quota" in error_msg:
+            except groq.RateLimitError:
                 st.error("❌ API quota exceeded. Please try again later.")
-            else:
+            except Exception as e:
                 st.error(f"❌ Unexpected error: {str(e)}")
 
+summarize_ui()
+
 # Helpful information
 if not groq_api_key:
     st.info("👈 Enter your Groq API key in the sidebar to get started!")
@@ -197,6 +440,7 @@ with st.expander("📦 Installation Requirements"):
     st.code("""
     pip install youtube-transcript-api
     pip install yt-dlp
+    pip install sentence-transformers  # optional: semantic summary cache
     """)
 
 # Example URLs
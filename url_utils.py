@@ -0,0 +1,24 @@
+"""URL helpers for the summarizer app.
+
+These live outside app.py because Streamlit re-executes the main script on
+every rerun, which would throw away the lru_cache memo each time.
+"""
+from functools import lru_cache
+import re
+
+import validators
+
+_YT_ID_RE = re.compile(
+    r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|live/|embed/)|youtu\.be/)([A-Za-z0-9_-]{11})"
+)
+
+@lru_cache(maxsize=256)
+def extract_video_id(url):
+    """Extract YouTube video ID from URL (watch, youtu.be, shorts, live and embed links)"""
+    m = _YT_ID_RE.search(url)
+    return m.group(1) if m else None
+
+@lru_cache(maxsize=256)
+def is_url(url):
+    """validators.url as a plain bool (it returns a falsy ValidationError object on failure)"""
+    return bool(validators.url(url))